@@ -1,9 +1,114 @@
+import json
+
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.admin import UserAdmin
-from chatpaat_app.models import Chat, ChatMessage, CustomUser, UserSearchHistory
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.db.models.functions import Left
+from django.utils.functional import cached_property
+from chatpaat_app.models import (
+    Chat,
+    ChatMessage,
+    CustomUser,
+    DailyTokenUsage,
+    TokenUsage,
+    UserDailyTokenUsage,
+    UserSearchHistory,
+)
 
 # Register your models here.
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids an exact COUNT(*) on large tables by asking the
+    PostgreSQL planner: pg_class.reltuples for unfiltered changelists and the
+    EXPLAIN row estimate for filtered ones. Lists the planner expects to be
+    small are counted exactly, with the count capped just above the threshold.
+    Other backends are always counted exactly.
+    """
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self._estimated_count()
+        if estimate is None:
+            return super().count
+        if estimate > self.exact_count_threshold:
+            return estimate
+        capped = self.object_list.order_by()[: self.exact_count_threshold + 1].count()
+        if capped <= self.exact_count_threshold:
+            return capped
+        # The planner statistics are badly out of date; fall back to counting.
+        return super().count
+
+    def _estimated_count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)",
+                    [connection.ops.quote_name(queryset.model._meta.db_table)],
+                )
+                row = cursor.fetchone()
+                # reltuples is -1 until the table has been vacuumed/analyzed.
+                if row is None or row[0] < 0:
+                    return None
+                return int(row[0])
+            sql, params = queryset.order_by().query.get_compiler(queryset.db).as_sql()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class PreviewChangeList(ChangeList):
+    """
+    ChangeList that fetches only a prefix of the admin's `preview_fields`
+    for the rows it displays. Actions still receive the full queryset.
+    """
+    def get_results(self, request):
+        queryset = self.queryset
+        self.queryset = queryset.defer(*self.model_admin.preview_fields).annotate(
+            **{
+                f"{name}_preview": Left(name, length)
+                for name, length in self.model_admin.preview_fields.items()
+            }
+        )
+        try:
+            super().get_results(request)
+        finally:
+            self.queryset = queryset
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist defaults for tables with millions of rows: estimated counts,
+    no second full-table count, and text columns truncated in SQL.
+    `preview_fields` maps a text field to the number of characters to fetch;
+    the truncated value is available on changelist rows as `<field>_preview`.
+
+    date_hierarchy is deliberately not used: its year links come from a
+    SELECT DISTINCT over the whole table. Filter on created_at with
+    list_filter instead, which issues index-backed range queries.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    preview_fields = {}
+
+    def get_changelist(self, request, **kwargs):
+        if self.preview_fields:
+            return PreviewChangeList
+        return super().get_changelist(request, **kwargs)
+
+
 @admin.register(CustomUser)
 class CustomUserAdmin(UserAdmin):
     model = CustomUser
@@ -18,12 +123,64 @@ class ChatAdmin(admin.ModelAdmin):
 
 
 @admin.register(ChatMessage)
-class ChatMessageAdmin(admin.ModelAdmin):
-    models = ChatMessage 
-    list_display = ("id", "role", "content", "created_at")
+class ChatMessageAdmin(LargeTableAdmin):
+    model = ChatMessage
+    list_display = ("id", "role", "content_preview", "created_at")
+    list_filter = ("role", "created_at")
+    preview_fields = {"content": 80}
+
+    @admin.display(description="content")
+    def content_preview(self, obj):
+        return obj.content_preview
 
 
 @admin.register(UserSearchHistory)
-class UserSearchHistoryAdmin(admin.ModelAdmin):
+class UserSearchHistoryAdmin(LargeTableAdmin):
     model = UserSearchHistory
-    list_display = ("id", "user", "search_query", "created_at")
\ No newline at end of file
+    list_display = ("id", "user", "search_query_preview", "created_at")
+    list_select_related = ("user",)
+    list_filter = ("created_at",)
+    preview_fields = {"search_query": 80}
+
+    @admin.display(description="search query")
+    def search_query_preview(self, obj):
+        return obj.search_query_preview
+
+
+class ReadOnlyUsageAdmin(LargeTableAdmin):
+    """
+    Usage rows are written by chatpaat_app.usage only.
+    """
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # Deleting rows would leave the rollup tables out of sync.
+        return False
+
+
+@admin.register(DailyTokenUsage)
+class DailyTokenUsageAdmin(ReadOnlyUsageAdmin):
+    model = DailyTokenUsage
+    list_display = ("day", "request_count", "prompt_tokens", "completion_tokens", "total_tokens", "total_latency_ms")
+    ordering = ("-day",)
+
+
+@admin.register(UserDailyTokenUsage)
+class UserDailyTokenUsageAdmin(ReadOnlyUsageAdmin):
+    model = UserDailyTokenUsage
+    list_display = ("day", "user", "request_count", "prompt_tokens", "completion_tokens", "total_tokens")
+    list_select_related = ("user",)
+    ordering = ("-day",)
+
+
+@admin.register(TokenUsage)
+class TokenUsageAdmin(ReadOnlyUsageAdmin):
+    model = TokenUsage
+    list_display = ("id", "user", "endpoint", "model", "prompt_tokens", "completion_tokens", "latency_ms", "created_at")
+    list_select_related = ("user",)
+    # endpoint has fixed choices, so its filter options don't need a DISTINCT scan.
+    list_filter = ("endpoint", "created_at")
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.3 on 2026-10-19 06:23
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """
+    CREATE INDEX CONCURRENTLY on PostgreSQL; a plain AddIndex on other
+    backends (e.g. SQLite test runs), which don't support CONCURRENTLY.
+    """
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    # Build indexes without locking the (large) message tables for writes.
+    # Concurrent builds are PostgreSQL-only; other backends get plain indexes.
+    atomic = False
+
+    dependencies = [
+        ('chatpaat_app', '0002_tokenusage_dailytokenusage_userdailytokenusage'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='chatmessage',
+            index=models.Index(fields=['created_at'], name='chatmessage_created_at_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='chatmessage',
+            index=models.Index(fields=['role', 'created_at'], name='chatmessage_role_created_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='usersearchhistory',
+            index=models.Index(fields=['created_at'], name='searchhistory_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatpaat_app', '0003_admin_changelist_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tokenusage',
+            name='endpoint',
+            field=models.CharField(choices=[('prompt_gpt', 'prompt_gpt'), ('create_chat_title', 'create_chat_title')], max_length=64),
+        ),
+    ]
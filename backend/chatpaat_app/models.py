@@ -36,6 +36,13 @@ class ChatMessage(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Back the admin's date hierarchy and role filter.
+        indexes = [
+            models.Index(fields=['created_at'], name='chatmessage_created_at_idx'),
+            models.Index(fields=['role', 'created_at'], name='chatmessage_role_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.role}: {self.content[:50]}"
 
@@ -48,5 +55,72 @@ class UserSearchHistory(models.Model):
     search_query = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='searchhistory_created_at_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username}: {self.search_query[:50]}"
+
+
+class TokenUsage(models.Model):
+    """
+    One row per Groq call, recording the `usage` block of the response.
+    Written by chatpaat_app.usage off the request path.
+    """
+    ENDPOINTS = (("prompt_gpt", "prompt_gpt"), ("create_chat_title", "create_chat_title"))
+
+    user = models.ForeignKey('CustomUser', on_delete=models.SET_NULL, related_name='token_usages', null=True, blank=True)
+    endpoint = models.CharField(max_length=64, choices=ENDPOINTS)
+    model = models.CharField(max_length=100)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    total_tokens = models.PositiveIntegerField(default=0)
+    latency_ms = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='tokenusage_created_at_idx'),
+            models.Index(fields=['endpoint', 'created_at'], name='tokenusage_endpoint_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint} ({self.model}): {self.total_tokens} tokens"
+
+
+class UserDailyTokenUsage(models.Model):
+    """
+    Incremental rollup of TokenUsage per user and day.
+    """
+    user = models.ForeignKey('CustomUser', on_delete=models.CASCADE, related_name='daily_token_usages')
+    day = models.DateField()
+    request_count = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveBigIntegerField(default=0)
+    completion_tokens = models.PositiveBigIntegerField(default=0)
+    total_tokens = models.PositiveBigIntegerField(default=0)
+    total_latency_ms = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='unique_user_daily_token_usage'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.day}: {self.total_tokens} tokens"
+
+
+class DailyTokenUsage(models.Model):
+    """
+    Incremental rollup of TokenUsage across all users per day.
+    """
+    day = models.DateField(unique=True)
+    request_count = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveBigIntegerField(default=0)
+    completion_tokens = models.PositiveBigIntegerField(default=0)
+    total_tokens = models.PositiveBigIntegerField(default=0)
+    total_latency_ms = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day}: {self.total_tokens} tokens"
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from chatpaat_app.models import Chat, ChatMessage, UserSearchHistory 
+from chatpaat_app.models import Chat, ChatMessage, UserDailyTokenUsage, UserSearchHistory 
 
      
 
@@ -26,4 +26,10 @@ class ChatMessageSerializer(serializers.ModelSerializer):
 class UserSearchHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = UserSearchHistory
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
+
+
+class UserDailyTokenUsageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserDailyTokenUsage
+        fields = ["day", "request_count", "prompt_tokens", "completion_tokens", "total_tokens", "total_latency_ms"]
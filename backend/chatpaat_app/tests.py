@@ -1,3 +1,226 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from chatpaat_app import usage
+from chatpaat_app.admin import EstimatedCountPaginator
+from chatpaat_app.models import (
+    Chat,
+    ChatMessage,
+    CustomUser,
+    DailyTokenUsage,
+    TokenUsage,
+    UserDailyTokenUsage,
+)
+
+
+def groq_response(prompt_tokens=5, completion_tokens=7, model="llama-3.1-8b-instant"):
+    return {
+        "model": model,
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+@override_settings(TOKEN_USAGE_ASYNC=False)
+class RecordTokenUsageTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+
+    def test_first_call_creates_rollups(self):
+        usage.record_token_usage(self.user, "prompt_gpt", groq_response(), 40)
+
+        row = TokenUsage.objects.get()
+        self.assertEqual((row.user, row.endpoint, row.total_tokens, row.latency_ms), (self.user, "prompt_gpt", 12, 40))
+        daily = UserDailyTokenUsage.objects.get(user=self.user)
+        self.assertEqual(daily.day, timezone.localdate(row.created_at))
+        self.assertEqual((daily.request_count, daily.prompt_tokens, daily.completion_tokens), (1, 5, 7))
+        self.assertEqual(DailyTokenUsage.objects.get().total_tokens, 12)
+
+    def test_later_calls_increment_rollups(self):
+        usage.record_token_usage(self.user, "prompt_gpt", groq_response(), 40)
+        usage.record_token_usage(self.user, "create_chat_title", groq_response(3, 4), 10)
+
+        daily = UserDailyTokenUsage.objects.get(user=self.user)
+        self.assertEqual((daily.request_count, daily.total_tokens, daily.total_latency_ms), (2, 19, 50))
+        self.assertEqual(DailyTokenUsage.objects.count(), 1)
+        self.assertEqual(DailyTokenUsage.objects.get().request_count, 2)
+
+    def test_concurrent_insert_falls_back_to_update(self):
+        day = timezone.localdate()
+        DailyTokenUsage.objects.create(day=day, request_count=1, prompt_tokens=1, completion_tokens=1, total_tokens=2)
+        row = TokenUsage(endpoint="prompt_gpt", prompt_tokens=5, completion_tokens=7, total_tokens=12, latency_ms=40)
+        real_update = QuerySet.update
+        calls = []
+
+        def update_missing_first_time(queryset, **kwargs):
+            # Pretend the aggregate didn't exist yet when we first tried to update it.
+            calls.append(kwargs)
+            return 0 if len(calls) == 1 else real_update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, "update", autospec=True, side_effect=update_missing_first_time):
+            usage._increment(DailyTokenUsage, {"day": day}, row)
+
+        daily = DailyTokenUsage.objects.get()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual((daily.request_count, daily.total_tokens, daily.total_latency_ms), (2, 14, 40))
+
+    def test_anonymous_or_missing_user_skips_user_rollup(self):
+        usage.record_token_usage(AnonymousUser(), "create_chat_title", groq_response(), 10)
+        usage.record_token_usage(None, "create_chat_title", groq_response(), 10)
+
+        self.assertFalse(TokenUsage.objects.filter(user__isnull=False).exists())
+        self.assertFalse(UserDailyTokenUsage.objects.exists())
+        self.assertEqual(DailyTokenUsage.objects.get().request_count, 2)
+
+    def test_null_model_is_recorded(self):
+        usage.record_token_usage(self.user, "prompt_gpt", groq_response(model=None), 10)
+
+        self.assertEqual(TokenUsage.objects.get().model, "")
+
+    def test_malformed_response_does_not_raise(self):
+        with self.assertLogs("chatpaat_app.usage", level="ERROR"):
+            usage.record_token_usage(self.user, "prompt_gpt", None, 10)
+        with self.assertLogs("chatpaat_app.usage", level="ERROR"):
+            usage.record_token_usage(self.user, "prompt_gpt", {"usage": {"prompt_tokens": "many"}}, 10)
+
+        self.assertFalse(TokenUsage.objects.exists())
+
+
+class TokenUsageViewTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        today = timezone.localdate()
+        for days_ago in (0, 1, 364, 365):
+            UserDailyTokenUsage.objects.create(
+                user=self.user,
+                day=today - timedelta(days=days_ago),
+                request_count=1,
+                prompt_tokens=2,
+                completion_tokens=3,
+                total_tokens=5,
+            )
+
+    def test_defaults_to_thirty_days(self):
+        response = self.client.get("/api/token_usage/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["days"]), 2)
+        self.assertEqual(response.data["totals"]["total_tokens"], 10)
+
+    def test_days_is_clamped(self):
+        self.assertEqual(len(self.client.get("/api/token_usage/?days=0").data["days"]), 1)
+        self.assertEqual(len(self.client.get("/api/token_usage/?days=1000").data["days"]), 3)
+
+    def test_invalid_days(self):
+        response = self.client.get("/api/token_usage/?days=week")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_authentication(self):
+        self.assertEqual(APIClient().get("/api/token_usage/").status_code, 401)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        chat = Chat.objects.create()
+        ChatMessage.objects.bulk_create(ChatMessage(chat=chat, role="user", content="hi") for _ in range(5))
+        self.queryset = ChatMessage.objects.order_by("-id")
+
+    def paginator_count(self, estimate, threshold=3):
+        paginator = EstimatedCountPaginator(self.queryset, 2)
+        paginator.exact_count_threshold = threshold
+        with mock.patch.object(EstimatedCountPaginator, "_estimated_count", return_value=estimate):
+            return paginator.count
+
+    def test_large_estimate_is_used_as_is(self):
+        self.assertEqual(self.paginator_count(1_000_000), 1_000_000)
+
+    def test_small_estimate_is_counted_exactly(self):
+        self.assertEqual(self.paginator_count(2, threshold=10), 5)
+
+    def test_stale_small_estimate_falls_back_to_exact_count(self):
+        self.assertEqual(self.paginator_count(2, threshold=3), 5)
+
+    def test_small_table_is_counted_exactly(self):
+        # Non-PostgreSQL backends, unanalyzed tables and small estimates all end in an exact count.
+        self.assertEqual(EstimatedCountPaginator(self.queryset, 2).count, 5)
+
+
+@skipUnless(connection.vendor == "postgresql", "planner estimates are PostgreSQL-only")
+class PostgresEstimatedCountTests(TestCase):
+    def setUp(self):
+        chat = Chat.objects.create()
+        ChatMessage.objects.bulk_create(
+            ChatMessage(chat=chat, role="user" if i % 5 else "assistant", content="hi") for i in range(500)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(ChatMessage._meta.db_table)}")
+
+    def test_unfiltered_estimate_reads_reltuples(self):
+        paginator = EstimatedCountPaginator(ChatMessage.objects.order_by("-id"), 100)
+
+        self.assertEqual(paginator._estimated_count(), 500)
+
+    def test_filtered_estimate_reads_explain_plan_rows(self):
+        queryset = ChatMessage.objects.filter(role="assistant").order_by("-id")
+        paginator = EstimatedCountPaginator(queryset, 100)
+
+        self.assertAlmostEqual(paginator._estimated_count(), 100, delta=20)
+
+    def test_estimate_above_threshold_is_returned(self):
+        paginator = EstimatedCountPaginator(ChatMessage.objects.filter(role="user"), 100)
+        paginator.exact_count_threshold = 10
+
+        self.assertAlmostEqual(paginator.count, 400, delta=40)
+
+
+class LargeTableAdminTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_superuser(username="admin", email="admin@example.com", password="pw")
+        self.client.force_login(self.user)
+        chat = Chat.objects.create(user=self.user)
+        self.messages = ChatMessage.objects.bulk_create(
+            ChatMessage(chat=chat, role="user", content="x" * 500) for _ in range(3)
+        )
+
+    def test_changelist_truncates_content(self):
+        response = self.client.get("/admin/chatpaat_app/chatmessage/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "x" * 80)
+        self.assertNotContains(response, "x" * 81)
+
+    def test_delete_confirmation_does_not_query_per_object(self):
+        data = {"action": "delete_selected", "_selected_action": [m.pk for m in self.messages]}
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post("/admin/chatpaat_app/chatmessage/", data)
+        ChatMessage.objects.bulk_create(
+            ChatMessage(chat=self.messages[0].chat, role="user", content="y") for _ in range(3)
+        )
+        data["_selected_action"] = list(ChatMessage.objects.values_list("pk", flat=True))
+        with CaptureQueriesContext(connection) as more_queries:
+            response = self.client.post("/admin/chatpaat_app/chatmessage/", data)
+
+        self.assertContains(response, "x" * 50)
+        self.assertEqual(len(more_queries), len(queries))
+
+    def test_endpoint_filter_does_not_scan_for_values(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/admin/chatpaat_app/tokenusage/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "create_chat_title")
+        self.assertFalse(any("DISTINCT" in query["sql"] for query in queries))
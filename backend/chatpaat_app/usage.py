@@ -0,0 +1,95 @@
+# backend/chatpaat_app/usage.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from chatpaat_app.models import DailyTokenUsage, TokenUsage, UserDailyTokenUsage
+
+logger = logging.getLogger(__name__)
+
+# Usage rows are written on a single background worker so Groq calls don't wait on them.
+# Set settings.TOKEN_USAGE_ASYNC = False (e.g. in tests) to record synchronously.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="token-usage")
+
+
+def record_token_usage(user, endpoint: str, response_data: dict, latency_ms: int) -> None:
+    """
+    Record the `usage` block of a Groq chat completion response.
+    Never raises: usage accounting must not break the chat endpoints.
+    """
+    try:
+        usage = response_data.get("usage") or {}
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        row = TokenUsage(
+            user=user if user is not None and user.is_authenticated else None,
+            endpoint=endpoint,
+            model=response_data.get("model") or "",
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=int(usage.get("total_tokens") or prompt_tokens + completion_tokens),
+            latency_ms=max(int(latency_ms), 0),
+        )
+        if getattr(settings, "TOKEN_USAGE_ASYNC", True):
+            _executor.submit(_write_in_worker, row)
+        else:
+            _write_quietly(row)
+    except Exception:
+        logger.exception("Failed to record token usage for %s", endpoint)
+
+
+def _write_in_worker(row: TokenUsage) -> None:
+    try:
+        _write_quietly(row)
+    finally:
+        # The worker thread owns its own connection; don't leak it.
+        connection.close()
+
+
+def _write_quietly(row: TokenUsage) -> None:
+    try:
+        _write(row)
+    except Exception:
+        logger.exception("Failed to write token usage for %s", row.endpoint)
+
+
+def _write(row: TokenUsage) -> None:
+    with transaction.atomic():
+        row.save()
+        day = timezone.localdate(row.created_at)
+        if row.user_id is not None:
+            _increment(UserDailyTokenUsage, {"user_id": row.user_id, "day": day}, row)
+        _increment(DailyTokenUsage, {"day": day}, row)
+
+
+def _increment(model, lookup: dict, row: TokenUsage) -> None:
+    """
+    Add one TokenUsage row to the aggregate identified by `lookup`,
+    creating the aggregate on first use.
+    """
+    increments = {
+        "request_count": F("request_count") + 1,
+        "prompt_tokens": F("prompt_tokens") + row.prompt_tokens,
+        "completion_tokens": F("completion_tokens") + row.completion_tokens,
+        "total_tokens": F("total_tokens") + row.total_tokens,
+        "total_latency_ms": F("total_latency_ms") + row.latency_ms,
+    }
+    if model.objects.filter(**lookup).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(
+                **lookup,
+                request_count=1,
+                prompt_tokens=row.prompt_tokens,
+                completion_tokens=row.completion_tokens,
+                total_tokens=row.total_tokens,
+                total_latency_ms=row.latency_ms,
+            )
+    except IntegrityError:
+        # Another writer created the aggregate between our update and insert.
+        model.objects.filter(**lookup).update(**increments)
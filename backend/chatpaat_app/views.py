@@ -1,6 +1,7 @@
 # views.py
 import uuid
 import os
+import time
 from django.shortcuts import get_object_or_404
 import requests
 from django.conf import settings
@@ -12,8 +13,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-from chatpaat_app.models import Chat, ChatMessage, UserSearchHistory
-from chatpaat_app.serializers import ChatMessageSerializer, ChatSerializer
+from chatpaat_app.models import Chat, ChatMessage, UserDailyTokenUsage, UserSearchHistory
+from chatpaat_app.serializers import ChatMessageSerializer, ChatSerializer, UserDailyTokenUsageSerializer
+from chatpaat_app.usage import record_token_usage
 from django.utils import timezone
 from datetime import timedelta
 from chatpaat_app.models import CustomUser
@@ -26,10 +28,11 @@ User = get_user_model()
 
 # ======================= Groq Helper =======================
 
-def createChatTitle(user_message: str) -> str:
+def createChatTitle(user_message: str, user=None) -> str:
     """
     Create a short title for the chat using Groq.
     Falls back to truncated user message on failure.
+    Token usage is recorded against `user` when given.
     """
     try:
         headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
@@ -48,9 +51,11 @@ def createChatTitle(user_message: str) -> str:
             "max_tokens": 16,
             "temperature": 0.2,
         }
+        started = time.monotonic()
         response = requests.post(GROQ_API_URL, headers=headers, json=payload, timeout=30)
         response.raise_for_status()
         data = response.json()
+        record_token_usage(user, "create_chat_title", data, (time.monotonic() - started) * 1000)
         title = data["choices"][0]["message"]["content"].strip()
         if not title:
             title = user_message[:50]
@@ -145,7 +150,7 @@ def prompt_gpt(request):
 
     if not chat.title:
         try:
-            chat.title = createChatTitle(content)
+            chat.title = createChatTitle(content, user=request.user)
             chat.save()
         except Exception:
             pass
@@ -165,9 +170,11 @@ def prompt_gpt(request):
             "max_tokens": 1024,
             "temperature": 0.6,
         }
+        started = time.monotonic()
         response = requests.post(GROQ_API_URL, headers=headers, json=payload, timeout=60)
         response.raise_for_status()
         data = response.json()
+        record_token_usage(request.user, "prompt_gpt", data, (time.monotonic() - started) * 1000)
         groq_reply = data["choices"][0]["message"]["content"]
         if not groq_reply:
             raise RuntimeError("Groq returned no text.")
@@ -234,3 +241,25 @@ def user_search(request):
     UserSearchHistory.objects.create(user=request.user, search_query=search_query)
 
     return Response({"message": "Search query stored successfully."}, status=status.HTTP_201_CREATED)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def token_usage(request):
+    """
+    Daily token usage for the current user, read from the per-user/day rollup.
+    ?days=<n> limits the window (default 30, max 365).
+    """
+    try:
+        days = min(max(int(request.query_params.get("days", 30)), 1), 365)
+    except ValueError:
+        return Response({"error": "days must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = UserDailyTokenUsage.objects.filter(user=request.user, day__gte=since).order_by("-day")
+    serializer = UserDailyTokenUsageSerializer(rows, many=True)
+    totals = {"request_count": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    for row in serializer.data:
+        for key in totals:
+            totals[key] += row[key]
+    return Response({"days": serializer.data, "totals": totals})